@@ -1,10 +1,22 @@
 import os
 import sys
-import json
-import re
+import time
+import random
+import pickle
+import hashlib
+import struct
+import functools
+import operator
+import threading
+import collections
+import concurrent.futures
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google import genai
 from google.genai import types
+from google.genai import errors as genai_errors
 
 # ──────────────────────────────────────────────
 # CONFIGURATION (env only — set in .env or host)
@@ -13,84 +25,423 @@ GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
 DISCORD_WEBHOOK_URL = os.environ["DISCORD_WEBHOOK_URL"]
 ROLIMONS_API_URL = os.environ.get("ROLIMONS_API_URL", "https://www.rolimons.com/itemapi/itemdetails")
 MIN_VALUE_THRESHOLD = int(os.environ.get("MIN_VALUE_THRESHOLD", "100000"))
+# Images scanned concurrently — keep within the Gemini requests-per-minute quota
+MAX_IMAGE_WORKERS = int(os.environ.get("MAX_IMAGE_WORKERS", "4"))
+# Gemini requests-per-minute budget (free tier for gemini-2.0-flash is 15)
+GEMINI_RPM = int(os.environ.get("GEMINI_RPM", "15"))
+GEMINI_MAX_RETRIES = 4
+# Images sent to Gemini per request; a post's gallery is scanned in batches this size
+GEMINI_BATCH_SIZE = int(os.environ.get("GEMINI_BATCH_SIZE", "4"))
+CACHE_DIR = os.environ.get("REDDIH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "reddih"))
+# Max age (seconds) of the on-disk Rolimons cache before it is re-fetched
+ROLIMONS_CACHE_TTL = int(os.environ.get("ROLIMONS_CACHE_TTL", "3600"))
+
+# Shared HTTP session so connections to Rolimons, Roblox, Discord and the
+# image CDNs are kept alive between requests. The pool is sized for every
+# download/post/notify worker hitting the same host at once.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=32, pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+))
 
 
 # ──────────────────────────────────────────────
 # ROLIMONS ITEM DATABASE
 # ──────────────────────────────────────────────
 
-def fetch_item_database():
-    """Fetch all Roblox limited items from the Rolimons API."""
+def fetch_item_database(validators: dict | None = None) -> tuple[dict | None, dict]:
+    """Fetch all Roblox limited items from the Rolimons API.
+
+    validators are the ETag/Last-Modified of a previous fetch, sent as a
+    conditional GET. Returns (items, validators); items is None when
+    Rolimons answers 304 Not Modified.
+    """
     print("Fetching Rolimons item database...")
-    resp = requests.get(
-        ROLIMONS_API_URL,
-        headers={"User-Agent": "VisionScanner/1.0"},
-        timeout=15,
-    )
+    headers = {"User-Agent": "VisionScanner/1.0"}
+    validators = validators or {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    resp = _HTTP.get(ROLIMONS_API_URL, headers=headers, timeout=15)
+    if resp.status_code == 304:
+        print("  Item database unchanged.")
+        return None, validators
     resp.raise_for_status()
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     if not data.get("success"):
         raise Exception("Rolimons API returned an error")
 
     print(f"  Loaded {data['item_count']} items.")
-    return data["items"]
+    return data["items"], {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
 
 
 def build_lookup_tables(items_db: dict) -> tuple:
-    """Pre-build fast lookup tables from the Rolimons database."""
+    """Pre-build fast lookup tables from the Rolimons database.
+
+    Every table maps to the same per-item record:
+      {"id", "name", "acronym", "value"}
+    where "value" is the Rolimons value, falling back to RAP when unvalued.
+    """
     name_lookup = {}
     acronym_lookup = {}
 
     for item_id, item_data in items_db.items():
+        item = {
+            "id": item_id,
+            "name": item_data[0],
+            "acronym": item_data[1],
+            "value": item_data[3] if item_data[3] != -1 else item_data[2],
+        }
+
         norm = normalize_name(item_data[0])
-        name_lookup[norm] = (item_id, item_data)
+        name_lookup[norm] = item
 
         acr = item_data[1].strip().lower()
         if acr:
-            acronym_lookup[acr] = (item_id, item_data)
+            acronym_lookup[acr] = item
+
+    name_trie = build_name_trie(name_lookup)
+
+    # Acronyms eligible for free-text scanning: drop the ones find_mentioned_items
+    # would always reject, so it doesn't re-check them for every post.
+    acronym_lookup_clean = {
+        acr: item for acr, item in acronym_lookup.items()
+        if len(acr) >= 2 and acr not in ACRONYM_BLACKLIST
+    }
+
+    return name_lookup, acronym_lookup, name_trie, acronym_lookup_clean
+
+
+# Sentinel keys inside trie nodes. Normalised names only contain [a-z0-9 ],
+# so these can never collide with a word.
+_TRIE_ITEM = "$"   # item record for the name ending at this node
+_TRIE_BEST = "*"   # (name_len, item record) longest name under this node
+
+
+def build_name_trie(name_lookup: dict) -> dict:
+    """Build a word-level prefix trie over the normalised item names.
+
+    Each node maps the next word to a child node. Every node also caches the
+    longest name passing through it, so a prefix query never has to walk the
+    subtree below the point where the prefix ends.
+    """
+    root = {}
+
+    for norm, entry in name_lookup.items():
+        node = root
+        for word in norm.split():
+            node = node.setdefault(word, {})
+            best = node.get(_TRIE_BEST)
+            if best is None or len(norm) > best[0]:
+                node[_TRIE_BEST] = (len(norm), entry)
+        node[_TRIE_ITEM] = entry
+
+    return root
+
+
+def _trie_longest_with_prefix(name_trie: dict, prefix_words: list[str]) -> dict | None:
+    """Return the longest entry whose normalised name starts with the prefix.
+
+    All words but the last must match exactly; the last word may be cut off
+    (e.g. "dominus formidulos"), so it is compared against the child words.
+    """
+    node = name_trie
+    for word in prefix_words[:-1]:
+        node = node.get(word)
+        if node is None:
+            return None
+
+    partial = prefix_words[-1]
+    best = None
+    for word, child in node.items():
+        if word in (_TRIE_ITEM, _TRIE_BEST) or not word.startswith(partial):
+            continue
+        if best is None or child[_TRIE_BEST][0] > best[0]:
+            best = child[_TRIE_BEST]
 
-    return name_lookup, acronym_lookup
+    return best[1] if best else None
+
+
+def _trie_scan(name_trie: dict, words: list[str], min_words: int = 2):
+    """Yield every entry whose full name appears as a run of whole words.
+
+    A single pass over the text: from each word, walk down the trie until the
+    next word has no edge. Names shorter than min_words are ignored.
+    """
+    for start in range(len(words)):
+        node = name_trie
+        for depth, word in enumerate(words[start:], 1):
+            node = node.get(word)
+            if node is None:
+                break
+            if depth >= min_words and _TRIE_ITEM in node:
+                yield node[_TRIE_ITEM]
+
+
+# Bump whenever the shape of build_lookup_tables() output or the cache changes
+_LOOKUP_CACHE_VERSION = 3
+
+
+def _write_lookup_cache(path: str, validators: dict, tables: tuple) -> None:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((_LOOKUP_CACHE_VERSION, validators, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"  Warning: could not write Rolimons cache ({e}).")
+
+
+def load_lookup_tables(max_age: float = ROLIMONS_CACHE_TTL) -> tuple:
+    """Return the lookup tables, reusing the on-disk cache if it is fresh.
+
+    The cache is a pickle of build_lookup_tables() output plus the HTTP
+    validators of the fetch it was built from. When it is older than max_age
+    seconds it is revalidated with a conditional GET: if Rolimons reports no
+    change the cached tables are kept, otherwise the tables are rebuilt and
+    written back. Pass max_age=0 to always revalidate.
+    """
+    path = os.path.join(CACHE_DIR, "lookup_tables.pkl")
+    validators, cached = {}, None
+
+    try:
+        age = time.time() - os.path.getmtime(path)
+        with open(path, "rb") as f:
+            version, *payload = pickle.load(f)
+        if version == _LOOKUP_CACHE_VERSION:
+            validators, cached = payload
+            if age < max_age:
+                print("Loaded Rolimons lookup tables from cache.")
+                return cached
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"  Warning: ignoring unreadable Rolimons cache ({e}).")
+
+    items_db, validators = fetch_item_database(validators if cached else None)
+    if items_db is None:
+        # Not modified — keep the cached tables and restart the max_age clock
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return cached
+
+    tables = build_lookup_tables(items_db)
+    _write_lookup_cache(path, validators, tables)
+    return tables
+
+
+_QUOTE_FOLD = str.maketrans({"\u2019": "'", "\u2018": "'"})
+# Every byte except [a-z0-9] becomes a space; split/join then collapses runs
+_NONALNUM_TO_SPACE_B = bytes(
+    c if (0x61 <= c <= 0x7A or 0x30 <= c <= 0x39) else 0x20 for c in range(256)
+)
 
 
 def normalize_name(name: str) -> str:
     """Normalize an item name for flexible comparison."""
-    s = name.lower().strip()
-    s = s.replace("\u2019", "'").replace("\u2018", "'")
-    s = s.replace("'s", "s").replace("'s", "s")
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = name.lower().strip().translate(_QUOTE_FOLD)
+    s = s.replace("'s", "s")
+    # Non-ASCII characters become "?" here and then a space below
+    b = s.encode("ascii", "replace").translate(_NONALNUM_TO_SPACE_B)
+    return b" ".join(b.split()).decode("ascii")
 
 
 # ──────────────────────────────────────────────
 # GEMINI VISION — HELPERS
 # ──────────────────────────────────────────────
 
+# Recently downloaded images, keyed by URL, so an image seen again (crossposts,
+# reposted galleries) isn't fetched twice. Bounded by total image bytes.
+_IMAGE_CACHE_MAX_BYTES = 100 * 1024 * 1024
+_image_cache: collections.OrderedDict[str, types.Part] = collections.OrderedDict()
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+
 def _download_image(image_url: str) -> types.Part:
-    """Download an image URL and return a Gemini Part."""
-    resp = requests.get(image_url, timeout=30)
+    """Download an image URL and return a Gemini Part (cached by URL)."""
+    global _image_cache_bytes
+
+    with _image_cache_lock:
+        part = _image_cache.get(image_url)
+        if part is not None:
+            _image_cache.move_to_end(image_url)
+            return part
+
+    resp = _HTTP.get(image_url, timeout=30)
     resp.raise_for_status()
     mime_type = resp.headers.get("Content-Type", "image/jpeg").split(";")[0].strip()
-    return types.Part.from_bytes(data=resp.content, mime_type=mime_type)
+    part = types.Part.from_bytes(data=resp.content, mime_type=mime_type)
+
+    size = len(resp.content)
+    if size <= _IMAGE_CACHE_MAX_BYTES:
+        with _image_cache_lock:
+            if image_url not in _image_cache:
+                _image_cache[image_url] = part
+                _image_cache_bytes += size
+            while _image_cache_bytes > _IMAGE_CACHE_MAX_BYTES:
+                _, evicted = _image_cache.popitem(last=False)
+                _image_cache_bytes -= len(evicted.inline_data.data)
+
+    return part
+
+
+# Images whose longest side is below this are avatars/emoji/icons, never a
+# readable trade screenshot — skipped without asking Gemini.
+MIN_IMAGE_SIDE = 128
+
+# JPEG start-of-frame markers (C4, C8 and CC are other segment types)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _image_dimensions(data: bytes) -> tuple[int, int] | None:
+    """Read (width, height) from a PNG, GIF, JPEG or WebP header.
+
+    Only the header bytes are inspected. Returns None for unknown formats.
+    """
+    try:
+        if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+            return struct.unpack(">II", data[16:24])
+
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", data[6:10])
+
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            chunk = data[12:16]
+            if chunk == b"VP8 ":
+                w, h = struct.unpack("<HH", data[26:30])
+                return w & 0x3FFF, h & 0x3FFF
+            if chunk == b"VP8L":
+                b0, b1, b2, b3 = data[21:25]
+                return 1 + (((b1 & 0x3F) << 8) | b0), 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | (b1 >> 6))
+            if chunk == b"VP8X":
+                return 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+            return None
+
+        if data[:2] == b"\xff\xd8":
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xFF:
+                    return None
+                marker = data[i + 1]
+                if marker == 0xFF:  # fill byte
+                    i += 1
+                    continue
+                if marker in _JPEG_SOF_MARKERS:
+                    h, w = struct.unpack(">HH", data[i + 5:i + 9])
+                    return w, h
+                if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # markers without a length
+                    i += 2
+                    continue
+                i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    except (struct.error, ValueError):
+        pass
+    return None
+
+
+def _is_scannable_image(image_part: types.Part) -> tuple[bool, str]:
+    """Cheap local check before spending a Gemini call on an image.
+
+    Returns (ok, reason). Rejects payloads that aren't a recognisable image
+    and images too small to show item names.
+    """
+    data = image_part.inline_data.data
+    mime_type = image_part.inline_data.mime_type or ""
+    dims = _image_dimensions(data)
+
+    if dims is None:
+        if not mime_type.startswith("image/"):
+            return False, f"not an image ({mime_type or 'unknown type'})"
+        return True, ""
 
+    width, height = dims
+    if max(width, height) < MIN_IMAGE_SIDE:
+        return False, f"image too small to read ({width}x{height})"
+    return True, ""
 
+
+@functools.lru_cache(maxsize=1)
 def _get_gemini_client() -> genai.Client:
     return genai.Client(api_key=GEMINI_API_KEY)
 
 
+# Token bucket shared by every thread that calls Gemini: holds up to GEMINI_RPM
+# tokens and refills at GEMINI_RPM per minute.
+_gemini_bucket_lock = threading.Lock()
+_gemini_tokens = float(GEMINI_RPM)
+_gemini_last_refill = time.monotonic()
+
+
+def _take_gemini_token() -> None:
+    """Block until a Gemini request is allowed under GEMINI_RPM."""
+    global _gemini_tokens, _gemini_last_refill
+
+    while True:
+        with _gemini_bucket_lock:
+            now = time.monotonic()
+            _gemini_tokens = min(
+                GEMINI_RPM,
+                _gemini_tokens + (now - _gemini_last_refill) * GEMINI_RPM / 60,
+            )
+            _gemini_last_refill = now
+            if _gemini_tokens >= 1:
+                _gemini_tokens -= 1
+                return
+            wait = (1 - _gemini_tokens) * 60 / GEMINI_RPM
+        time.sleep(wait)
+
+
+# Deterministic answers: the same image or post always gets the same verdict
+_GEMINI_CONFIG = types.GenerateContentConfig(temperature=0)
+
+
+def _generate_content(**kwargs):
+    """Call Gemini's generate_content, rate-limited and retried on 429s.
+
+    Rate-limit errors are retried with jittered exponential backoff; any other
+    error (or the final 429) is raised to the caller.
+    """
+    client = _get_gemini_client()
+
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        _take_gemini_token()
+        try:
+            return client.models.generate_content(**kwargs)
+        except genai_errors.APIError as e:
+            if e.code != 429 or attempt == GEMINI_MAX_RETRIES:
+                raise
+            delay = 2 ** attempt + random.uniform(0, 1)
+            print(f"  Gemini rate limit hit, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
 # ──────────────────────────────────────────────
-# STEP 1: PRE-SCREEN — does this image reference
-#         a Roblox limited item at all?
+# PRE-SCREEN + EXTRACT — one Gemini call decides, for each
+#         image in a batch, whether it references a Roblox
+#         limited item and, if so, lists every item in it
 # ──────────────────────────────────────────────
 
-def prescreen_image(image_part: types.Part) -> bool:
-    """Ask Gemini a simple yes/no: does this image reference a Roblox limited item?"""
-    client = _get_gemini_client()
+def prescreen_and_extract(image_parts: list[types.Part]) -> str:
+    """Ask Gemini, in one request, which images reference limiteds and what items they show.
 
+    Returns the raw response text — a JSON array with one
+    {"relevant": bool, "items": [...]} object per image, in order.
+    Parse it with parse_gemini_response().
+    """
     prompt = (
-        "Look at this image carefully.\n"
-        "Is this image referencing a Roblox limited item? "
+        f"You are given {len(image_parts)} image(s) from a Reddit post, in order. "
+        "Look at each image carefully and answer for EACH image separately.\n\n"
+        "STEP 1: Is the image referencing a Roblox limited item? "
         "Roblox limited items are special virtual accessories/gear that can be traded "
         "between players (hats, faces, gear, etc.).\n\n"
         "Signs that an image references a limited item:\n"
@@ -99,31 +450,9 @@ def prescreen_image(image_part: types.Part) -> bool:
         "- Text mentioning specific Roblox limited item names or acronyms\n"
         "- A Roblox avatar wearing recognizable limited items\n"
         "- A Rolimons page or similar value-checking site\n\n"
-        "Answer with ONLY the word: yes or no"
-    )
-
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=[prompt, image_part],
-    )
-
-    answer = response.text.strip().lower()
-    return answer.startswith("yes")
-
-
-# ──────────────────────────────────────────────
-# STEP 2: EXTRACT — identify every item in the image
-# ──────────────────────────────────────────────
-
-def extract_items_from_image(image_part: types.Part) -> str:
-    """Use Gemini Vision to extract Roblox item details from an image."""
-    client = _get_gemini_client()
-
-    prompt = (
-        "This image is from a Reddit post about Roblox limited items.\n"
-        "Your job is to identify EVERY Roblox limited item name mentioned or shown "
-        "anywhere in this image.\n\n"
-        "The image could be ANY of these formats:\n"
+        "STEP 2: If it is, identify EVERY Roblox limited item name mentioned or shown "
+        "anywhere in that image.\n\n"
+        "An image could be ANY of these formats:\n"
         "- A Roblox trade window showing items on both sides\n"
         "- An inventory or catalog screenshot\n"
         "- A Rolimons value change notification (item name as title, old/new values)\n"
@@ -136,22 +465,26 @@ def extract_items_from_image(image_part: types.Part) -> str:
         '- "value": the highest numerical value shown for that item '
         "(could be labeled as value, RAP, new value, price, etc). "
         "Use 0 if no value is visible.\n\n"
-        "Return ONLY a valid JSON array of objects.\n"
+        f"Return ONLY a valid JSON array with exactly {len(image_parts)} object(s), "
+        "one per image, in the same order as the images.\n"
+        'Each object is {"relevant": true or false, "items": [ ...item objects... ]}.\n'
         "Examples:\n"
-        '  [{"name": "Domino Crown", "value": 24000000}]\n'
-        '  [{"name": "Hooded Firelord", "value": 4200000}]\n'
-        '  [{"name": "Bighead", "value": 5000}, {"name": "Goldrow", "value": 316}]\n\n'
+        '  [{"relevant": true, "items": [{"name": "Domino Crown", "value": 24000000}]}]\n'
+        '  [{"relevant": false, "items": []}, '
+        '{"relevant": true, "items": [{"name": "Bighead", "value": 5000}, {"name": "Goldrow", "value": 316}]}]\n\n'
         "Important:\n"
         "- Read the EXACT item names from the image text, do not guess.\n"
         "- If a value is shown with commas (like 4,200,000), return it as a number (4200000).\n"
-        "- Look EVERYWHERE in the image for item names — titles, labels, text, etc.\n"
-        "- Even if only ONE item is shown, return it in the array.\n"
-        "- If you truly cannot find any Roblox item names, return: []"
+        "- Look EVERYWHERE in each image for item names — titles, labels, text, etc.\n"
+        "- Even if only ONE item is shown, return it in the items array.\n"
+        '- If an image is not relevant, or you truly cannot find any Roblox item names '
+        'in it, use "items": []'
     )
 
-    response = client.models.generate_content(
+    response = _generate_content(
         model="gemini-2.0-flash",
-        contents=[prompt, image_part],
+        contents=[prompt, *image_parts],
+        config=_GEMINI_CONFIG,
     )
 
     return response.text
@@ -161,8 +494,38 @@ def extract_items_from_image(image_part: types.Part) -> str:
 # PARSING AND MATCHING
 # ──────────────────────────────────────────────
 
-def parse_gemini_response(raw_text: str) -> list:
-    """Parse the JSON array of item objects from Gemini's response."""
+# Every byte except ASCII digits — deleted to turn "4,200,000" into "4200000"
+_NON_DIGIT_BYTES = bytes(b for b in range(256) if not 0x30 <= b <= 0x39)
+
+
+def _parse_detected_items(entries) -> list:
+    """Turn one image's list of item entries into [{"name", "value"}] dicts."""
+    if not isinstance(entries, list):
+        return []
+
+    items = []
+    for entry in entries:
+        if isinstance(entry, str):
+            items.append({"name": entry.strip(), "value": 0})
+        elif isinstance(entry, dict) and isinstance(entry.get("name"), str):
+            val = entry.get("value", 0)
+            if isinstance(val, str):
+                val = val.encode("ascii", "ignore").translate(None, _NON_DIGIT_BYTES) or b"0"
+            try:
+                val = int(val or 0)
+            except (TypeError, ValueError):
+                continue  # e.g. "value": [1] — not a number we can use
+            items.append({"name": entry["name"].strip(), "value": val})
+
+    return items
+
+
+def parse_gemini_response(raw_text: str, image_count: int) -> list[tuple[bool, list]]:
+    """Parse Gemini's per-image JSON array.
+
+    Returns up to image_count (is_relevant, detected_items) pairs, in image
+    order. Images missing from a malformed response are left out.
+    """
     text = raw_text.strip()
 
     if text.startswith("```"):
@@ -171,33 +534,37 @@ def parse_gemini_response(raw_text: str) -> list:
     text = text.strip()
 
     try:
-        result = json.loads(text)
-    except json.JSONDecodeError:
+        result = orjson.loads(text)
+    except orjson.JSONDecodeError:
         print(f"  Warning: Could not parse Gemini response as JSON.")
         print(f"  Raw response: {raw_text[:500]}")
-        return []
+        result = []
 
     if not isinstance(result, list):
-        return []
+        result = []
+    if len(result) != image_count:
+        print(f"  Warning: Gemini returned {len(result)} result(s) for {image_count} image(s).")
+
+    verdicts = []
+    for entry in result[:image_count]:
+        if isinstance(entry, dict):
+            verdicts.append((entry.get("relevant") is True, _parse_detected_items(entry.get("items"))))
+        else:
+            verdicts.append((False, []))
 
-    items = []
-    for entry in result:
-        if isinstance(entry, str):
-            items.append({"name": entry.strip(), "value": 0})
-        elif isinstance(entry, dict) and "name" in entry:
-            val = entry.get("value", 0)
-            if isinstance(val, str):
-                val = int(re.sub(r"[^0-9]", "", val) or "0")
-            items.append({"name": entry["name"].strip(), "value": int(val or 0)})
+    return verdicts
 
-    return items
+
+# Sort key for item records — a C-level getter rather than a Python lambda
+_BY_VALUE = operator.itemgetter("value")
 
 
 def match_single_item(
     detected_name: str,
     name_lookup: dict,
     acronym_lookup: dict,
-) -> tuple | None:
+    name_trie: dict,
+) -> dict | None:
     """Try to match a single detected name against the database.
 
     Matching order:
@@ -207,7 +574,7 @@ def match_single_item(
          from a cut-off label), match it against the start of Rolimons names.
          Only matches if the prefix is 3+ words to avoid false positives.
 
-    Returns (item_id, item_data) or None.
+    Returns the item record or None.
     """
     det_lower = detected_name.strip().lower()
     det_norm = normalize_name(detected_name)
@@ -222,13 +589,9 @@ def match_single_item(
 
     # 3. Prefix match (handles truncated names like "Dominus Formidulos...")
     #    Require at least 2 words so single common words don't false-match
-    if len(det_norm.split()) >= 2 and len(det_norm) >= 8:
-        best_match = None
-        best_len = 0
-        for db_norm, (item_id, item_data) in name_lookup.items():
-            if db_norm.startswith(det_norm) and len(db_norm) > best_len:
-                best_match = (item_id, item_data)
-                best_len = len(db_norm)
+    det_words = det_norm.split()
+    if len(det_words) >= 2 and len(det_norm) >= 8:
+        best_match = _trie_longest_with_prefix(name_trie, det_words)
         if best_match:
             return best_match
 
@@ -239,6 +602,7 @@ def match_items_rolimons_only(
     detected_items: list,
     name_lookup: dict,
     acronym_lookup: dict,
+    name_trie: dict,
 ) -> list:
     """Match detected items against the Rolimons database.
 
@@ -248,27 +612,28 @@ def match_items_rolimons_only(
     results = []
     seen_ids = set()
 
+    # Gemini often lists the same item several times (e.g. a trade window
+    # full of the same hat) — only look each distinct name up once. The raw
+    # lowercased name is part of the key because match_single_item also tries
+    # it as an exact acronym ("Valk." and "Valk" normalise alike but only
+    # "valk" is an acronym).
+    unique = {}
     for det in detected_items:
+        unique.setdefault((normalize_name(det["name"]), det["name"].strip().lower()), det)
+
+    for det in unique.values():
         det_name = det["name"]
 
-        match = match_single_item(det_name, name_lookup, acronym_lookup)
+        match = match_single_item(det_name, name_lookup, acronym_lookup, name_trie)
 
-        if match and match[0] not in seen_ids:
-            item_id, item_data = match
-            rolimons_value = item_data[3] if item_data[3] != -1 else item_data[2]
-            if rolimons_value < MIN_VALUE_THRESHOLD:
+        if match and match["id"] not in seen_ids:
+            if match["value"] < MIN_VALUE_THRESHOLD:
                 continue  # skip items below the value threshold
 
-            results.append({
-                "id": item_id,
-                "name": item_data[0],
-                "acronym": item_data[1],
-                "value": rolimons_value,
-                "detected_as": det_name,
-            })
-            seen_ids.add(item_id)
+            results.append({**match, "detected_as": det_name})
+            seen_ids.add(match["id"])
 
-    results.sort(key=lambda x: x["value"], reverse=True)
+    results.sort(key=_BY_VALUE, reverse=True)
     return results
 
 
@@ -276,36 +641,68 @@ def match_items_rolimons_only(
 # ROBLOX THUMBNAIL
 # ──────────────────────────────────────────────
 
-def get_item_thumbnail(item_id: str | None) -> str:
-    """Fetch the Roblox CDN thumbnail URL for an item."""
-    if not item_id:
-        return ""
+@functools.lru_cache(maxsize=4096)
+def _fetch_item_thumbnail(item_id: str) -> str:
+    """Look up an item thumbnail. Raises on failure so errors aren't cached."""
     url = (
         f"https://thumbnails.roblox.com/v1/assets"
         f"?assetIds={item_id}"
         f"&returnPolicy=PlaceHolder&size=420x420&format=Png&isCircular=false"
     )
+    resp = _HTTP.get(url, timeout=10)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    if data.get("data") and len(data["data"]) > 0:
+        return data["data"][0].get("imageUrl", "")
+    return ""
+
+
+def get_item_thumbnail(item_id: str | None) -> str:
+    """Fetch the Roblox CDN thumbnail URL for an item (cached per item id)."""
+    if not item_id:
+        return ""
     try:
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
-        if data.get("data") and len(data["data"]) > 0:
-            return data["data"][0].get("imageUrl", "")
+        return _fetch_item_thumbnail(item_id)
     except Exception:
-        pass
-    return ""
+        return ""
 
 
 # ──────────────────────────────────────────────
 # DISCORD EMBED
 # ──────────────────────────────────────────────
 
+# Discord webhooks are sent from here so callers don't wait on the round-trip.
+# Call _notify_pool.shutdown(wait=True) before exiting to flush pending sends.
+_notify_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="discord")
+
+
+def _notify(send, *args, **kwargs) -> None:
+    """Run a Discord send function on the background pool, logging failures."""
+    def run():
+        try:
+            send(*args, **kwargs)
+        except Exception as e:
+            print(f"    Discord error: {e}")
+
+    _notify_pool.submit(run)
+
+
 def send_discord_embed(
     item: dict,
     source_url: str = None,
     post_title: str = None,
     post_url: str = None,
 ) -> None:
-    """Send a Discord embed for a detected high-value Roblox limited item."""
+    """Queue a Discord embed for a detected high-value Roblox limited item."""
+    _notify(_send_discord_embed, item, source_url, post_title, post_url)
+
+
+def _send_discord_embed(
+    item: dict,
+    source_url: str = None,
+    post_title: str = None,
+    post_url: str = None,
+) -> None:
     thumbnail_url = get_item_thumbnail(item["id"])
     value_str = f"R$ {item['value']:,}"
 
@@ -341,7 +738,7 @@ def send_discord_embed(
             {"name": "Source", "value": f"[View Image]({source_url})", "inline": False}
         )
 
-    resp = requests.post(
+    resp = _HTTP.post(
         DISCORD_WEBHOOK_URL,
         json={"embeds": [embed]},
         timeout=10,
@@ -359,6 +756,17 @@ def send_discord_text_lead(
     post_body: str,
     verdict: str,
     matched_items: list[dict] = None,
+) -> None:
+    """Queue a Discord embed for a text-only post that looks like a potential seller."""
+    _notify(_send_discord_text_lead, post_title, post_url, post_body, verdict, matched_items)
+
+
+def _send_discord_text_lead(
+    post_title: str,
+    post_url: str,
+    post_body: str,
+    verdict: str,
+    matched_items: list[dict] = None,
 ) -> None:
     """Send a Discord embed for a text-only post that looks like a potential seller."""
     body_preview = post_body[:400] + "..." if len(post_body) > 400 else post_body
@@ -385,7 +793,7 @@ def send_discord_text_lead(
         if thumbnail_url:
             embed["thumbnail"] = {"url": thumbnail_url}
 
-    resp = requests.post(
+    resp = _HTTP.post(
         DISCORD_WEBHOOK_URL,
         json={"embeds": [embed]},
         timeout=10,
@@ -397,124 +805,135 @@ def send_discord_text_lead(
         print(f"    Discord error ({resp.status_code}): {resp.text}")
 
 
+def send_startup_notice(subreddit_names: list[str], min_interval: float, max_interval: float) -> None:
+    """Queue the monitor's "Monitor Started" embed; startup doesn't wait on Discord."""
+    _notify(_send_startup_notice, subreddit_names, min_interval, max_interval)
+
+
+def _send_startup_notice(subreddit_names: list[str], min_interval: float, max_interval: float) -> None:
+    subs = ", ".join(f"**r/{s}**" for s in subreddit_names)
+    embed = {
+        "title": "Monitor Started",
+        "color": 0x00CC00,
+        "description": (
+            f"Now watching {subs} for new posts.\n"
+            f"Polling every **{min_interval}–{max_interval}s**, faster while busy."
+        ),
+    }
+    _HTTP.post(
+        DISCORD_WEBHOOK_URL,
+        json={"embeds": [embed]},
+        timeout=10,
+    )
+
+
 # ──────────────────────────────────────────────
 # GEMINI TEXT POST SCREENING
 # ──────────────────────────────────────────────
 
+# Common short words/slang that collide with Rolimons acronyms — never match these
+ACRONYM_BLACKLIST = frozenset({
+    "mm",   # middleman
+    "dc",   # disconnect
+    "w",    # win
+    "l",    # loss
+    "f",    # fair
+    "op",   # original poster / overpowered
+    "pc",   # price check
+    "nvm",  # nevermind
+    "pm",   # private message
+    "dm",   # direct message
+    "rn",   # right now
+    "gg",   # good game
+    "bb",   # baby / bye bye
+    "gl",   # good luck
+    "ty",   # thank you
+    "np",   # no problem
+    "lf",   # looking for
+    "ft",   # for trade
+    "nft",  # not for trade
+    "id",   # identification
+    "da",   # the
+    "pf",   # profile
+    "fb",   # facebook
+    "sc",   # snapchat
+    "rt",   # retweet
+    "ep",   # episode
+    "hb",   # hurry back
+    "sb",   # somebody
+    "cs",   # customer service
+    "ci",   # see i / confidential informant
+    "aa",   # alcoholics anonymous
+    "bt",   # bluetooth
+    "dh",   # dear husband
+    "rs",   # runescape
+    "gw",   # guild wars
+    "ac",   # animal crossing
+    "iv",   # four
+    "es",   # spanish
+    "ss",   # screenshot
+    "bm",   # bad manners
+    "se",   # special edition
+    "tv",   # television
+})
+
+
 def find_mentioned_items(
     text: str,
-    name_lookup: dict,
-    acronym_lookup: dict,
+    name_trie: dict,
+    acronym_lookup_clean: dict,
 ) -> tuple[list[dict], list[dict]]:
     """Scan text for exact Rolimons item names or acronyms.
 
     Returns (above_threshold, below_threshold) — two lists of matched items.
     """
     text_lower = text.lower()
-    text_norm = normalize_name(text)
+    words_lower = text_lower.split()
+    if not words_lower:
+        return [], []
+
     above = []
     below = []
     seen_ids = set()
 
-    # Check every item name (normalized) against the normalized text
-    for norm_name, (item_id, item_data) in name_lookup.items():
-        if item_id in seen_ids:
-            continue
-        # Only match names with 2+ words to avoid false positives on short words
-        if len(norm_name.split()) < 2:
-            continue
-        if norm_name in text_norm:
-            value = item_data[3] if item_data[3] != -1 else item_data[2]
-            item = {
-                "id": item_id,
-                "name": item_data[0],
-                "acronym": item_data[1],
-                "value": value,
-            }
-            if value >= MIN_VALUE_THRESHOLD:
-                above.append(item)
-            elif value > 0:
-                below.append(item)
-            seen_ids.add(item_id)
-
-    # Common short words/slang that collide with Rolimons acronyms — never match these
-    ACRONYM_BLACKLIST = {
-        "mm",   # middleman
-        "dc",   # disconnect
-        "w",    # win
-        "l",    # loss
-        "f",    # fair
-        "op",   # original poster / overpowered
-        "pc",   # price check
-        "nvm",  # nevermind
-        "pm",   # private message
-        "dm",   # direct message
-        "rn",   # right now
-        "gg",   # good game
-        "bb",   # baby / bye bye
-        "gl",   # good luck
-        "ty",   # thank you
-        "np",   # no problem
-        "lf",   # looking for
-        "ft",   # for trade
-        "nft",  # not for trade
-        "id",   # identification
-        "da",   # the
-        "pf",   # profile
-        "fb",   # facebook
-        "sc",   # snapchat
-        "rt",   # retweet
-        "ep",   # episode
-        "hb",   # hurry back
-        "sb",   # somebody
-        "cs",   # customer service
-        "ci",   # see i / confidential informant
-        "aa",   # alcoholics anonymous
-        "bt",   # bluetooth
-        "dh",   # dear husband
-        "rs",   # runescape
-        "gw",   # guild wars
-        "ac",   # animal crossing
-        "iv",   # four
-        "es",   # spanish
-        "ss",   # screenshot
-        "bm",   # bad manners
-        "se",   # special edition
-        "tv",   # television
-    }
-
-    # Check acronyms — must be 3+ chars, or a non-blacklisted standalone word
-    words_in_text = set(text_lower.split())
-    for acr, (item_id, item_data) in acronym_lookup.items():
-        if item_id in seen_ids:
-            continue
-        if len(acr) < 2:
+    # Walk the normalized text through the name trie once.
+    # Only match names with 2+ words to avoid false positives on short words,
+    # so one-word texts skip the name pass entirely.
+    words_norm = normalize_name(text).split()
+    if len(words_norm) < 2:
+        words_norm = []
+    for item in _trie_scan(name_trie, words_norm, min_words=2):
+        if item["id"] in seen_ids:
             continue
-        if acr in ACRONYM_BLACKLIST:
+        if item["value"] >= MIN_VALUE_THRESHOLD:
+            above.append(item)
+        elif item["value"] > 0:
+            below.append(item)
+        seen_ids.add(item["id"])
+
+    # Check acronyms — must be 3+ chars, or a non-blacklisted standalone word.
+    # Look each distinct word of the text up in the acronym table rather than
+    # walking the whole table. Too-short and blacklisted acronyms were already
+    # dropped from acronym_lookup_clean when the tables were built.
+    original_words = set(text.split())
+    for acr in dict.fromkeys(words_lower):
+        item = acronym_lookup_clean.get(acr)
+        if item is None or item["id"] in seen_ids:
             continue
         # For short acronyms (2-3 chars), require them to be uppercase in original text
         # to reduce false positives on common words
         if len(acr) <= 3:
             # Check if the acronym appears as an uppercase word in the original text
-            original_words = set(text.split())
             if acr.upper() not in original_words:
                 continue
-        if acr in words_in_text:
-            value = item_data[3] if item_data[3] != -1 else item_data[2]
-            item = {
-                "id": item_id,
-                "name": item_data[0],
-                "acronym": item_data[1],
-                "value": value,
-            }
-            if value >= MIN_VALUE_THRESHOLD:
-                above.append(item)
-            elif value > 0:
-                below.append(item)
-            seen_ids.add(item_id)
-
-    above.sort(key=lambda x: x["value"], reverse=True)
-    below.sort(key=lambda x: x["value"], reverse=True)
+        if item["value"] >= MIN_VALUE_THRESHOLD:
+            above.append(item)
+        elif item["value"] > 0:
+            below.append(item)
+        seen_ids.add(item["id"])
+
+    above.sort(key=_BY_VALUE, reverse=True)
+    below.sort(key=_BY_VALUE, reverse=True)
     return above, below
 
 
@@ -523,6 +942,8 @@ def screen_text_post(
     body: str,
     name_lookup: dict,
     acronym_lookup: dict,
+    name_trie: dict,
+    acronym_lookup_clean: dict,
 ) -> tuple[bool, str, list[dict]]:
     """Screen a text post for potential limited item sellers.
 
@@ -537,7 +958,7 @@ def screen_text_post(
     combined = f"{title} {body}".strip()
 
     # ── Pass 1: exact item name/acronym scan ──
-    above, below = find_mentioned_items(combined, name_lookup, acronym_lookup)
+    above, below = find_mentioned_items(combined, name_trie, acronym_lookup_clean)
 
     if above:
         names = ", ".join(m["name"] for m in above)
@@ -548,7 +969,6 @@ def screen_text_post(
         return False, f"Item(s) found but below R$ {MIN_VALUE_THRESHOLD:,} threshold: {names}", []
 
     # ── Pass 2: Gemini screening for generic "returning player" / "sell my account" posts ──
-    client = _get_gemini_client()
     combined_text = f"Title: {title}\n\nBody: {body}" if body else f"Title: {title}"
 
     prompt = (
@@ -581,9 +1001,10 @@ def screen_text_post(
     )
 
     try:
-        response = client.models.generate_content(
+        response = _generate_content(
             model="gemini-2.0-flash",
             contents=prompt,
+            config=_GEMINI_CONFIG,
         )
         text = response.text.strip()
     except Exception as e:
@@ -598,7 +1019,8 @@ def screen_text_post(
     for line in lines:
         line_lower = line.strip().lower()
         if line_lower.startswith("verdict:"):
-            verdict = "yes" in line_lower.split(":", 1)[1]
+            # Exactly "yes" — "yes, but not a limited..." or "not yes" is a no
+            verdict = line_lower.split(":", 1)[1].strip().rstrip(".,!") == "yes"
         elif line_lower.startswith("reason:"):
             reason = line.strip().split(":", 1)[1].strip()
         elif line_lower.startswith("items:"):
@@ -620,22 +1042,14 @@ def screen_text_post(
         matched_below = []
 
         for item_name in gemini_item_names:
-            match = match_single_item(item_name, name_lookup, acronym_lookup)
+            match = match_single_item(item_name, name_lookup, acronym_lookup, name_trie)
             if match:
-                item_id, item_data = match
-                value = item_data[3] if item_data[3] != -1 else item_data[2]
-                item_info = {
-                    "id": item_id,
-                    "name": item_data[0],
-                    "acronym": item_data[1],
-                    "value": value,
-                }
-                if value > MIN_VALUE_THRESHOLD:
-                    matched_above.append(item_info)
-                    print(f"      {item_data[0]} — R$ {value:,} (ABOVE threshold)")
+                if match["value"] > MIN_VALUE_THRESHOLD:
+                    matched_above.append(match)
+                    print(f"      {match['name']} — R$ {match['value']:,} (ABOVE threshold)")
                 else:
-                    matched_below.append(item_info)
-                    print(f"      {item_data[0]} — R$ {value:,} (at or below threshold)")
+                    matched_below.append(match)
+                    print(f"      {match['name']} — R$ {match['value']:,} (at or below threshold)")
             else:
                 print(f"      '{item_name}' — no Rolimons match found")
 
@@ -648,7 +1062,7 @@ def screen_text_post(
 
         # If we have items above threshold, return them as a confirmed lead
         if matched_above:
-            matched_above.sort(key=lambda x: x["value"], reverse=True)
+            matched_above.sort(key=_BY_VALUE, reverse=True)
             names = ", ".join(m["name"] for m in matched_above)
             return True, f"{reason} (Confirmed item(s): {names})", matched_above
 
@@ -658,7 +1072,11 @@ def screen_text_post(
 
 
 def send_discord_skip_notice(image_url: str, reason: str) -> None:
-    """Send a simple Discord message when an image is skipped (for testing)."""
+    """Queue a simple Discord message when an image is skipped (for testing)."""
+    _notify(_send_discord_skip_notice, image_url, reason)
+
+
+def _send_discord_skip_notice(image_url: str, reason: str) -> None:
     embed = {
         "title": "Image Skipped",
         "color": 0x808080,
@@ -668,7 +1086,7 @@ def send_discord_skip_notice(image_url: str, reason: str) -> None:
         ],
     }
 
-    resp = requests.post(
+    resp = _HTTP.post(
         DISCORD_WEBHOOK_URL,
         json={"embeds": [embed]},
         timeout=10,
@@ -681,73 +1099,76 @@ def send_discord_skip_notice(image_url: str, reason: str) -> None:
 
 
 # ──────────────────────────────────────────────
-# PROCESS A SINGLE IMAGE
+# PROCESS IMAGES
 # ──────────────────────────────────────────────
 
-def process_image(
+# Gemini's (is_relevant, detected_items) verdict per image, keyed by the SHA-1
+# of its bytes, so the same screenshot under another URL (crossposts, mirrors,
+# re-encoded previews of identical bytes) isn't sent to Gemini again.
+_VERDICT_CACHE_MAX = 2000
+_verdict_cache: collections.OrderedDict[bytes, tuple[bool, list]] = collections.OrderedDict()
+_verdict_cache_lock = threading.Lock()
+
+
+def _remember_verdict(digest: bytes, verdict: tuple[bool, list]) -> None:
+    with _verdict_cache_lock:
+        _verdict_cache[digest] = verdict
+        while len(_verdict_cache) > _VERDICT_CACHE_MAX:
+            _verdict_cache.popitem(last=False)
+
+
+# Downloads for the images of one post/batch run side by side
+_download_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=MAX_IMAGE_WORKERS, thread_name_prefix="download",
+)
+
+
+def _try_download_image(image_url: str) -> types.Part | None:
+    try:
+        return _download_image(image_url)
+    except Exception as e:
+        print(f"  Error downloading {image_url}: {e}")
+        return None
+
+
+def _best_match_for_image(
     image_url: str,
+    is_relevant: bool,
+    detected_items: list,
     name_lookup: dict,
     acronym_lookup: dict,
+    name_trie: dict,
     testing: bool = False,
-    post_title: str = None,
-    post_url: str = None,
-):
-    """Full pipeline for a single image URL.
-
-    Returns True if a hit was found and sent, False otherwise.
-    """
+) -> dict | None:
+    """Report Gemini's verdict for one image and match its items against Rolimons."""
     print(f"\n{'='*50}")
-    print(f"Processing: {image_url}")
+    print(f"Image: {image_url}")
     print(f"{'='*50}")
 
-    # ── Download image once (reused for both calls) ──
-    try:
-        print("  Downloading image...")
-        image_part = _download_image(image_url)
-    except Exception as e:
-        print(f"  Error downloading image: {e}")
-        return False
-
-    # ── Pre-screen: does this image reference a limited? ──
-    print("  Pre-screening with Gemini...")
-    is_relevant = prescreen_image(image_part)
-
     if not is_relevant:
         print("  Result: NOT a limited item image. Skipping.")
         if testing:
             send_discord_skip_notice(image_url, "Gemini determined this image does not reference a Roblox limited item.")
-        return False
-
-    print("  Result: Image likely references a limited item. Extracting details...")
-
-    # ── Extract items ──
-    try:
-        raw_response = extract_items_from_image(image_part)
-    except Exception as e:
-        print(f"  Error extracting items: {e}")
-        return False
-
-    print(f"  Gemini output: {raw_response.strip()[:300]}")
+        return None
 
-    # ── Parse ──
-    detected_items = parse_gemini_response(raw_response)
+    print("  Result: Image likely references a limited item.")
 
     if not detected_items:
         print("  No items detected by Gemini.")
         if testing:
             send_discord_skip_notice(image_url, "Gemini could not extract any item names from this image.")
-        return False
+        return None
 
     print(f"  Detected {len(detected_items)} item(s):")
     for d in detected_items:
         print(f"    - {d['name']}  (displayed: {d['value']:,})")
 
     # ── Match against Rolimons (ONLY Rolimons matches count) ──
-    matches = match_items_rolimons_only(detected_items, name_lookup, acronym_lookup)
+    matches = match_items_rolimons_only(detected_items, name_lookup, acronym_lookup, name_trie)
 
     if not matches:
         print(f"  No items above R$ {MIN_VALUE_THRESHOLD:,} threshold. Skipping.")
-        return False
+        return None
 
     # ── Report ──
     print(f"  Matched {len(matches)} Rolimons item(s):")
@@ -758,7 +1179,136 @@ def process_image(
 
     best = matches[0]
     print(f"\n  Highest value: {best['name']} at R$ {best['value']:,}")
-    print("  Sending embed to Discord...")
+    return best
+
+
+def _gemini_verdicts(batch: list[tuple[int, types.Part]]) -> dict[int, tuple[bool, list]]:
+    """Get Gemini's (is_relevant, detected_items) for each (index, image) in batch.
+
+    Images scanned before are answered from the cache; the rest share one
+    Gemini call. Indexes are missing from the result if that call failed.
+    """
+    # ── Reuse Gemini's verdict for images whose bytes were scanned before ──
+    verdicts = {}
+    to_scan = []
+    for idx, image_part in batch:
+        digest = hashlib.sha1(image_part.inline_data.data).digest()
+        with _verdict_cache_lock:
+            verdict = _verdict_cache.get(digest)
+        if verdict is not None:
+            verdicts[idx] = verdict
+        else:
+            to_scan.append((idx, digest, image_part))
+    if verdicts:
+        print(f"  Reusing Gemini results for {len(verdicts)} image(s) seen before.")
+
+    # ── Pre-screen + extract every remaining image in a single Gemini call ──
+    if to_scan:
+        print(f"  Scanning {len(to_scan)} image(s) with Gemini...")
+        # A failed call or an unusable reply leaves this batch unanswered (and uncached)
+        try:
+            raw_response = prescreen_and_extract([image_part for _, _, image_part in to_scan])
+            print(f"  Gemini output: {raw_response.strip()[:300]}")
+            parsed = parse_gemini_response(raw_response, len(to_scan))
+        except Exception as e:
+            print(f"  Error scanning images: {e}")
+        else:
+            for (idx, digest, _), verdict in zip(to_scan, parsed):
+                verdicts[idx] = verdict
+                _remember_verdict(digest, verdict)
+            # Missing from the response — not relevant this time, but not cached
+            for idx, _, _ in to_scan[len(parsed):]:
+                verdicts[idx] = (False, [])
+
+    return verdicts
+
+
+def scan_images(
+    image_urls: list[str],
+    name_lookup: dict,
+    acronym_lookup: dict,
+    name_trie: dict,
+    testing: bool = False,
+    stop_on_hit: bool = False,
+) -> list[dict | None]:
+    """Scan several images (e.g. one post's gallery), GEMINI_BATCH_SIZE per Gemini call, without alerting.
+
+    Returns one entry per URL, in order: the highest-value Rolimons match
+    above the threshold, or None. With stop_on_hit, batches after the first
+    one containing a hit are not sent to Gemini and stay None.
+    """
+    results = [None] * len(image_urls)
+
+    # ── Download every image concurrently ──
+    print(f"  Downloading {len(image_urls)} image(s)...")
+    parts = list(_download_pool.map(_try_download_image, image_urls))
+
+    # ── Local pre-filter: skip tiny images/non-images before Gemini ──
+    batch = []
+    for idx, (image_url, image_part) in enumerate(zip(image_urls, parts)):
+        if image_part is None:
+            continue
+        ok, reason = _is_scannable_image(image_part)
+        if not ok:
+            print(f"  Skipped {image_url}: {reason}.")
+            if testing:
+                send_discord_skip_notice(image_url, f"Skipped before Gemini: {reason}.")
+            continue
+        batch.append((idx, image_part))
+
+    # ── Pre-screen + extract in batches, stopping early once a batch hits ──
+    for start in range(0, len(batch), GEMINI_BATCH_SIZE):
+        chunk = batch[start:start + GEMINI_BATCH_SIZE]
+        verdicts = _gemini_verdicts(chunk)
+
+        for idx, _ in chunk:
+            if idx in verdicts:
+                is_relevant, detected_items = verdicts[idx]
+                results[idx] = _best_match_for_image(
+                    image_urls[idx], is_relevant, detected_items,
+                    name_lookup, acronym_lookup, name_trie, testing=testing,
+                )
+
+        remaining = len(batch) - start - len(chunk)
+        if stop_on_hit and remaining and any(results[idx] for idx, _ in chunk):
+            print(f"  Hit found — skipping the remaining {remaining} image(s).")
+            break
+
+    return results
+
+
+def scan_image(
+    image_url: str,
+    name_lookup: dict,
+    acronym_lookup: dict,
+    name_trie: dict,
+    testing: bool = False,
+) -> dict | None:
+    """Download and scan a single image URL, without alerting.
+
+    Returns the highest-value Rolimons match above the threshold, or None.
+    """
+    return scan_images([image_url], name_lookup, acronym_lookup, name_trie, testing=testing)[0]
+
+
+def process_image(
+    image_url: str,
+    name_lookup: dict,
+    acronym_lookup: dict,
+    name_trie: dict,
+    testing: bool = False,
+    post_title: str = None,
+    post_url: str = None,
+):
+    """Full pipeline for a single image URL.
+
+    Returns True if a hit was found and queued for Discord, False otherwise.
+    """
+    best = scan_image(image_url, name_lookup, acronym_lookup, name_trie, testing=testing)
+    if best is None:
+        return False
+
+    print("  Queueing embed for Discord...")
     send_discord_embed(best, source_url=image_url, post_title=post_title, post_url=post_url)
     return True
 
@@ -787,25 +1337,25 @@ def main():
         print("No image URLs provided.")
         sys.exit(1)
 
-    # ── Fetch Rolimons database (once for all images) ──
+    # ── Load Rolimons database (once for all images, cached on disk) ──
     try:
-        items_db = fetch_item_database()
+        name_lookup, acronym_lookup, name_trie, _ = load_lookup_tables()
     except Exception as e:
         print(f"Error fetching Rolimons data: {e}")
         sys.exit(1)
 
-    name_lookup, acronym_lookup = build_lookup_tables(items_db)
+    # ── Process images concurrently (all the work is network-bound) ──
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_IMAGE_WORKERS) as pool:
+        results = list(pool.map(
+            lambda url: process_image(url, name_lookup, acronym_lookup, name_trie, testing=testing),
+            image_urls,
+        ))
 
-    # ── Process each image ──
-    hits = 0
-    skips = 0
+    hits = sum(1 for found in results if found)
+    skips = len(results) - hits
 
-    for url in image_urls:
-        found = process_image(url, name_lookup, acronym_lookup, testing=testing)
-        if found:
-            hits += 1
-        else:
-            skips += 1
+    # ── Wait for queued Discord messages to go out ──
+    _notify_pool.shutdown(wait=True)
 
     # ── Summary ──
     print(f"\n{'='*50}")
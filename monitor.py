@@ -12,17 +12,22 @@ Usage:
 """
 
 import os
+import re
 import sys
+import random
 import time
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
 import praw
-import requests
 from main import (
-    fetch_item_database,
-    build_lookup_tables,
-    process_image,
+    load_lookup_tables,
+    scan_images,
     screen_text_post,
+    send_discord_embed,
     send_discord_text_lead,
-    DISCORD_WEBHOOK_URL,
+    send_startup_notice,
+    CACHE_DIR,
 )
 
 # ──────────────────────────────────────────────
@@ -35,12 +40,20 @@ REDDIT_PASSWORD = os.environ["REDDIT_PASSWORD"]
 REDDIT_USER_AGENT = os.environ.get("REDDIT_USER_AGENT", "VisionScanner/1.0 by smg110")
 
 SUBREDDIT_NAMES = ["RobloxTrading", "crosstradingroblox", "RobloxLimiteds"]
-POLL_INTERVAL = 45
+POLL_INTERVAL = 45  # starting interval; adapts between the bounds below
+POLL_INTERVAL_MIN = 15  # while new posts keep arriving
+POLL_INTERVAL_MAX = 300  # after a long quiet spell
 MAX_POSTS_PER_CHECK = 15
 ROLIMONS_REFRESH_MINS = 30
+POST_WORKERS = 4  # posts processed concurrently — each may make Gemini calls
+MAX_PENDING_POSTS = 2 * POST_WORKERS  # posts queued or processing before polling waits
+SEEN_IDS_MAX = 10000  # most recent post IDs remembered (and saved) for dedup
+SEEN_IDS_RESUME_SECS = 900  # resume from saved IDs instead of re-seeding if saved this recently
+SEEN_IDS_PATH = os.path.join(CACHE_DIR, "seen_posts.txt")
 
 IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
 IMAGE_DOMAINS = ("i.redd.it", "i.imgur.com", "preview.redd.it")
+_IMAGE_DOMAIN_SET = frozenset(IMAGE_DOMAINS)
 
 TRADE_FLAIRS = {
     "trade ad", "trade ads",
@@ -73,41 +86,44 @@ TEXT_LEAD_KEYWORDS = [
     "quit roblox", "quitting roblox", "leaving roblox",
 ]
 
+# Each keyword list as one alternation, so a post is scanned once per list
+# instead of once per keyword
+_EXCLUDE_RE = re.compile("|".join(map(re.escape, EXCLUDE_KEYWORDS)))
+_TEXT_LEAD_RE = re.compile("|".join(map(re.escape, TEXT_LEAD_KEYWORDS)))
+# Direct image links pasted into a text post's body
+_IMG_URL_RE = re.compile(r'https?://(?:i\.redd\.it|i\.imgur\.com|preview\.redd\.it)/[^\s\)\]>"]+')
+
 
 # ──────────────────────────────────────────────
 # HELPERS
 # ──────────────────────────────────────────────
 
-def is_excluded(post) -> bool:
+def classify(post) -> str:
+    """Return "exclude" (noise), "lead" (possible text lead) or "other" for a post."""
     title_lower = post.title.strip().lower()
     flair = (post.link_flair_text or "").strip().lower()
 
-    for exclude in EXCLUDE_KEYWORDS:
-        if exclude in title_lower or exclude in flair:
-            return True
-    return False
+    # "\n" never occurs in a keyword, so no match can span title and flair
+    if _EXCLUDE_RE.search(title_lower + "\n" + flair):
+        return "exclude"
 
-def is_potential_text_lead(post) -> bool:
-    title_lower = post.title.strip().lower()
     body_lower = (post.selftext or "").strip().lower()
-    flair = (post.link_flair_text or "").strip().lower()
+    if _TEXT_LEAD_RE.search(title_lower + " " + body_lower) or flair in TRADE_FLAIRS:
+        return "lead"
 
-    for exclude in EXCLUDE_KEYWORDS:
-        if exclude in title_lower or exclude in flair:
-            return False
+    return "other"
 
-    combined = title_lower + " " + body_lower
-    for keyword in TEXT_LEAD_KEYWORDS:
-        if keyword in combined:
-            return True
 
-    if flair in TRADE_FLAIRS:
-        return True
-
-    return False
+def get_image_urls_from_post(post) -> list[str]:
+    """Image URLs of a post; worked out once, then cached on the post object."""
+    try:
+        return post._image_urls
+    except AttributeError:
+        post._image_urls = _find_image_urls(post)
+        return post._image_urls
 
 
-def get_image_urls_from_post(post) -> list[str]:
+def _find_image_urls(post) -> list[str]:
     urls = []
     url = post.url
 
@@ -124,9 +140,9 @@ def get_image_urls_from_post(post) -> list[str]:
         if urls:
             return urls
 
-    if any(url.lower().endswith(ext) for ext in IMAGE_EXTENSIONS):
+    if url.lower().endswith(IMAGE_EXTENSIONS):
         return [url]
-    if any(domain in url for domain in IMAGE_DOMAINS):
+    if urlsplit(url).netloc in _IMAGE_DOMAIN_SET:
         return [url]
 
     try:
@@ -160,12 +176,7 @@ def get_image_urls_from_post(post) -> list[str]:
 
     body = getattr(post, "selftext", "") or ""
     if body:
-        import re
-        img_pattern = re.findall(
-            r'https?://(?:i\.redd\.it|i\.imgur\.com|preview\.redd\.it)/[^\s\)\]>"]+',
-            body,
-        )
-        for found_url in img_pattern:
+        for found_url in _IMG_URL_RE.findall(body):
             clean = found_url.replace("&amp;", "&")
             if clean not in urls:
                 urls.append(clean)
@@ -175,57 +186,129 @@ def get_image_urls_from_post(post) -> list[str]:
     return []
 
 
-def send_startup_notice(subreddit_names: list[str]) -> None:
-    subs = ", ".join(f"**r/{s}**" for s in subreddit_names)
-    embed = {
-        "title": "Monitor Started",
-        "color": 0x00CC00,
-        "description": (
-            f"Now watching {subs} for new posts.\n"
-            f"Polling every **{POLL_INTERVAL}s**."
-        ),
-    }
+# ──────────────────────────────────────────────
+# SEEN POSTS
+# ──────────────────────────────────────────────
+
+class SeenPostIds:
+    """Size-bounded set of post IDs, oldest dropped first; shared by the post workers."""
+
+    def __init__(self, ids=(), maxlen: int = SEEN_IDS_MAX):
+        self._ids = dict.fromkeys(ids)  # insertion-ordered, so the first key is the oldest
+        self._maxlen = maxlen
+        self._lock = threading.Lock()
+        self._trim()
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, post_id: str) -> None:
+        with self._lock:
+            self._ids[post_id] = None
+            self._trim()
+
+    def update(self, post_ids) -> None:
+        with self._lock:
+            self._ids.update(dict.fromkeys(post_ids))
+            self._trim()
+
+    def _trim(self) -> None:
+        while len(self._ids) > self._maxlen:
+            del self._ids[next(iter(self._ids))]
+
+    def save(self, path: str = SEEN_IDS_PATH) -> None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock:
+                data = "\n".join(self._ids)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  Warning: could not save seen posts ({e}).")
+
+
+def load_seen_post_ids(path: str = SEEN_IDS_PATH, max_age: float = SEEN_IDS_RESUME_SECS) -> SeenPostIds | None:
+    """Return the IDs saved by a previous run, or None if there are none saved within max_age seconds."""
     try:
-        requests.post(
-            DISCORD_WEBHOOK_URL,
-            json={"embeds": [embed]},
-            timeout=10,
-        )
-    except Exception:
-        pass
+        if time.time() - os.path.getmtime(path) > max_age:
+            return None
+        with open(path) as f:
+            return SeenPostIds(f.read().split())
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"  Warning: ignoring unreadable seen posts ({e}).")
+        return None
+
+
+# ──────────────────────────────────────────────
+# REDDIT FETCHING
+# ──────────────────────────────────────────────
+
+# One listing request per subreddit runs at a time, all subreddits in parallel
+_fetch_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=len(SUBREDDIT_NAMES), thread_name_prefix="reddit",
+)
+
+
+def _connect_reddit() -> praw.Reddit:
+    return praw.Reddit(
+        client_id=REDDIT_CLIENT_ID,
+        client_secret=REDDIT_CLIENT_SECRET,
+        username=REDDIT_USERNAME,
+        password=REDDIT_PASSWORD,
+        user_agent=REDDIT_USER_AGENT,
+    )
+
+
+def _fetch_new_posts(reddits: dict, limit: int) -> dict[str, list]:
+    """Fetch the newest posts of every subreddit in parallel.
+
+    reddits maps each subreddit name to its own praw.Reddit instance (PRAW
+    instances are not thread-safe). Returns {sub_name: [posts]}. If any
+    request fails its exception is re-raised, as the serial loop did.
+    """
+    futures = {
+        sub_name: _fetch_pool.submit(lambda r=reddit, s=sub_name: list(r.subreddit(s).new(limit=limit)))
+        for sub_name, reddit in reddits.items()
+    }
+    return {sub_name: future.result() for sub_name, future in futures.items()}
 
 
 # ──────────────────────────────────────────────
 # MAIN MONITOR LOOP
 # ──────────────────────────────────────────────
 
-def _process_post(post, name_lookup, acronym_lookup, seen_post_ids, testing, sub_name):
+# Rolimons refreshes run here so polling never stalls on the download/rebuild
+_refresh_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="rolimons")
+
+
+def _process_post(post, name_lookup, acronym_lookup, name_trie, acronym_lookup_clean, seen_post_ids, testing, sub_name):
     seen_post_ids.add(post.id)
     post_link = f"https://reddit.com{post.permalink}"
     image_urls = get_image_urls_from_post(post)
 
     if image_urls:
         print(f"  Image post — {len(image_urls)} image(s). Sending to Gemini...")
-        for idx, img_url in enumerate(image_urls):
-            print(f"  Image {idx + 1}/{len(image_urls)}: {img_url}")
-            try:
-                found = process_image(
-                    img_url, name_lookup, acronym_lookup,
-                    testing=testing,
-                    post_title=post.title,
-                    post_url=post_link,
-                )
-                if found:
-                    return ("hit", "")
-            except Exception as e:
-                print(f"  Error: {e}")
+        results = scan_images(image_urls, name_lookup, acronym_lookup, name_trie, testing=testing, stop_on_hit=True)
+        # A post is a hit if any of its images is — alert once, on the first one
+        for img_url, best in zip(image_urls, results):
+            if best:
+                print(f"  Hit in image: {img_url}")
+                send_discord_embed(best, source_url=img_url, post_title=post.title, post_url=post_link)
+                return ("hit", "")
         return ("skip", "scanned image(s) but no Rolimons item at or above 100k value")
 
-    if is_potential_text_lead(post):
+    if classify(post) == "lead":
         print(f"  Potential text lead. Screening...")
         body = (post.selftext or "").strip()
         is_lead, reason, matched_items = screen_text_post(
-            post.title, body, name_lookup, acronym_lookup,
+            post.title, body, name_lookup, acronym_lookup, name_trie, acronym_lookup_clean,
         )
         if is_lead:
             print(f"  LEAD confirmed: {reason}")
@@ -240,34 +323,27 @@ def _process_post(post, name_lookup, acronym_lookup, seen_post_ids, testing, sub
 
 def run_monitor(testing: bool = False, once: bool = False, scan_last: int = 0):
     print("Connecting to Reddit...")
-    reddit = praw.Reddit(
-        client_id=REDDIT_CLIENT_ID,
-        client_secret=REDDIT_CLIENT_SECRET,
-        username=REDDIT_USERNAME,
-        password=REDDIT_PASSWORD,
-        user_agent=REDDIT_USER_AGENT,
-    )
+    reddits = {sub_name: _connect_reddit() for sub_name in SUBREDDIT_NAMES}
     subs_str = ", ".join(f"r/{s}" for s in SUBREDDIT_NAMES)
     print(f"  Connected. Monitoring: {subs_str}")
 
-    items_db = fetch_item_database()
-    name_lookup, acronym_lookup = build_lookup_tables(items_db)
+    name_lookup, acronym_lookup, name_trie, acronym_lookup_clean = load_lookup_tables(max_age=ROLIMONS_REFRESH_MINS * 60)
     last_rolimons_refresh = time.time()
 
-    seen_post_ids = set()
+    seen_post_ids = SeenPostIds()
 
     if scan_last > 0:
         total_hits = 0
         total_skips = 0
         total_posts = 0
 
-        for sub_name in SUBREDDIT_NAMES:
-            subreddit = reddit.subreddit(sub_name)
+        listings = _fetch_new_posts(reddits, scan_last)
+        for sub_name, posts in listings.items():
             print(f"\n{'='*50}")
             print(f"  Scanning last {scan_last} post(s) from r/{sub_name}")
             print(f"{'='*50}")
 
-            for post in subreddit.new(limit=scan_last):
+            for post in posts:
                 if post.id in seen_post_ids:
                     continue
                 total_posts += 1
@@ -276,19 +352,20 @@ def run_monitor(testing: bool = False, once: bool = False, scan_last: int = 0):
                 print(f"  Flair: {flair}")
                 print(f"  Link:  https://reddit.com{post.permalink}")
 
-                scan_images = get_image_urls_from_post(post)
-                if is_excluded(post):
+                image_urls = get_image_urls_from_post(post)
+                kind = classify(post)
+                if kind == "exclude":
                     print(f"  Excluded (noise). Skipping.")
                     seen_post_ids.add(post.id)
                     total_skips += 1
                     continue
-                if not scan_images and not is_potential_text_lead(post):
+                if not image_urls and kind != "lead":
                     print(f"  Text-only, no lead keywords. Skipping.")
                     seen_post_ids.add(post.id)
                     total_skips += 1
                     continue
 
-                result, reason = _process_post(post, name_lookup, acronym_lookup, seen_post_ids, testing, sub_name)
+                result, reason = _process_post(post, name_lookup, acronym_lookup, name_trie, acronym_lookup_clean, seen_post_ids, testing, sub_name)
                 if result in ("hit", "lead"):
                     total_hits += 1
                 else:
@@ -302,64 +379,120 @@ def run_monitor(testing: bool = False, once: bool = False, scan_last: int = 0):
         if once:
             return
     else:
-        print("Seeding with existing posts...")
-        for sub_name in SUBREDDIT_NAMES:
-            subreddit = reddit.subreddit(sub_name)
-            count = 0
-            for post in subreddit.new(limit=MAX_POSTS_PER_CHECK):
-                seen_post_ids.add(post.id)
-                count += 1
-            print(f"  r/{sub_name}: seeded {count} post(s)")
-        print(f"  Total: {len(seen_post_ids)} post(s). Will only process NEW posts from now on.")
+        resumed = load_seen_post_ids()
+        if resumed is not None:
+            # Restarted shortly after the last run — pick up posts made while down
+            seen_post_ids = resumed
+            print(f"Resuming with {len(seen_post_ids)} seen post(s) from the last run.")
+        else:
+            print("Seeding with existing posts...")
+            listings = _fetch_new_posts(reddits, MAX_POSTS_PER_CHECK)
+            for sub_name, posts in listings.items():
+                seen_post_ids.update(post.id for post in posts)
+                print(f"  r/{sub_name}: seeded {len(posts)} post(s)")
+            print(f"  Total: {len(seen_post_ids)} post(s). Will only process NEW posts from now on.")
+            seen_post_ids.save()
+
+    send_startup_notice(SUBREDDIT_NAMES, POLL_INTERVAL_MIN, POLL_INTERVAL_MAX)
 
-    send_startup_notice(SUBREDDIT_NAMES)
+    print(f"\nMonitor is live. Polling every {POLL_INTERVAL_MIN}-{POLL_INTERVAL_MAX}s. Press Ctrl+C to stop.\n")
 
-    print(f"\nMonitor is live. Polling every {POLL_INTERVAL}s. Press Ctrl+C to stop.\n")
+    post_pool = concurrent.futures.ThreadPoolExecutor(max_workers=POST_WORKERS, thread_name_prefix="post")
+    refresh_job = None
+    poll_interval = POLL_INTERVAL
+    # (post, job) still being processed — a slow post never holds up the next poll
+    pending = []
 
     while True:
         try:
-            if time.time() - last_rolimons_refresh > ROLIMONS_REFRESH_MINS * 60:
-                print("Refreshing Rolimons data...")
+            # Posts keep using the current tables until a refresh has finished
+            if refresh_job is None and time.time() - last_rolimons_refresh > ROLIMONS_REFRESH_MINS * 60:
+                print("Refreshing Rolimons data in the background...")
+                refresh_job = _refresh_pool.submit(load_lookup_tables, max_age=0)
+            if refresh_job is not None and refresh_job.done():
                 try:
-                    items_db = fetch_item_database()
-                    name_lookup, acronym_lookup = build_lookup_tables(items_db)
+                    name_lookup, acronym_lookup, name_trie, acronym_lookup_clean = refresh_job.result()
                     last_rolimons_refresh = time.time()
+                    print("Rolimons data refreshed.")
                 except Exception as e:
                     print(f"  Warning: Rolimons refresh failed ({e}), using cached data.")
+                refresh_job = None
+
+            # Backpressure: don't fetch more while the post workers are full up
+            in_flight = sum(not job.done() for _, job in pending)
+            if in_flight >= MAX_PENDING_POSTS:
+                concurrent.futures.wait(
+                    [job for _, job in pending], return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                in_flight = sum(not job.done() for _, job in pending)
 
             new_count = 0
             hit_count = 0
+            finished_count = 0
+            deferred_count = 0
 
-            for sub_name in SUBREDDIT_NAMES:
-                subreddit = reddit.subreddit(sub_name)
-
-                for post in subreddit.new(limit=MAX_POSTS_PER_CHECK):
+            listings = _fetch_new_posts(reddits, MAX_POSTS_PER_CHECK)
+            for sub_name, posts in listings.items():
+                for post in posts:
                     if post.id in seen_post_ids:
                         continue
+                    if in_flight >= MAX_PENDING_POSTS:
+                        # Left unmarked, so a later poll picks it up
+                        deferred_count += 1
+                        continue
 
                     new_count += 1
                     post_link = f"https://reddit.com{post.permalink}"
                     flair = (post.link_flair_text or "none").strip()
 
                     image_urls = get_image_urls_from_post(post)
-                    if is_excluded(post):
+                    kind = classify(post)
+                    if kind == "exclude":
                         seen_post_ids.add(post.id)
                         continue
-                    if not image_urls and not is_potential_text_lead(post):
+                    if not image_urls and kind != "lead":
                         seen_post_ids.add(post.id)
                         continue
 
                     print(f"\n[r/{sub_name}] \"{post.title}\" [{flair}]")
                     print(f"  Link: {post_link}")
 
-                    result, reason = _process_post(post, name_lookup, acronym_lookup, seen_post_ids, testing, sub_name)
-                    if result in ("hit", "lead"):
-                        hit_count += 1
-                    elif reason:
-                        print(f"  No alert: {reason}")
-
-            if new_count > 0:
-                print(f"\n[{time.strftime('%H:%M:%S')}] Checked {new_count} new post(s) across {len(SUBREDDIT_NAMES)} subs, {hit_count} hit(s).")
+                    seen_post_ids.add(post.id)
+                    in_flight += 1
+                    pending.append((post, post_pool.submit(
+                        _process_post, post, name_lookup, acronym_lookup, name_trie,
+                        acronym_lookup_clean, seen_post_ids, testing, sub_name,
+                    )))
+
+            # Saved on every successful poll, even a quiet one, so the file's age
+            # tells a restart how long ago the monitor was last running
+            seen_post_ids.save()
+
+            # Report finished posts; unfinished ones carry over to the next poll
+            # (--once waits for them all)
+            still_pending = []
+            for post, job in pending:
+                if not once and not job.done():
+                    still_pending.append((post, job))
+                    continue
+                finished_count += 1
+                try:
+                    result, reason = job.result()
+                except Exception as e:
+                    print(f"  Error processing \"{post.title}\": {e}")
+                    continue
+                if result in ("hit", "lead"):
+                    hit_count += 1
+                elif reason:
+                    print(f"  No alert for \"{post.title}\": {reason}")
+            pending = still_pending
+
+            if new_count or finished_count or deferred_count:
+                deferred = f", {deferred_count} deferred to the next poll" if deferred_count else ""
+                print(
+                    f"\n[{time.strftime('%H:%M:%S')}] Checked {new_count} new post(s) across {len(SUBREDDIT_NAMES)} subs, "
+                    f"{finished_count} finished with {hit_count} hit(s), {len(pending)} still processing{deferred}."
+                )
             else:
                 print(f"[{time.strftime('%H:%M:%S')}] No new posts.", end="\r")
 
@@ -376,7 +509,12 @@ def run_monitor(testing: bool = False, once: bool = False, scan_last: int = 0):
             print("\n--once flag set. Exiting after single check.")
             break
 
-        time.sleep(POLL_INTERVAL)
+        # Poll sooner while posts are coming in, back off while quiet
+        if new_count > 0 or deferred_count > 0:
+            poll_interval = max(POLL_INTERVAL_MIN, poll_interval * 0.7)
+        else:
+            poll_interval = min(POLL_INTERVAL_MAX, poll_interval * 1.5)
+        time.sleep(poll_interval + random.uniform(0, poll_interval * 0.1))
 
 
 # ──────────────────────────────────────────────